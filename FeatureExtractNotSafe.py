@@ -1,8 +1,9 @@
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 import tldextract
 import socket
-import requests
+import asyncio
+import aiohttp
 from bs4 import BeautifulSoup
 import whois
 import datetime
@@ -11,6 +12,11 @@ from dotenv import load_dotenv
 import csv
 import logging
 import random
+import functools
+import numpy as np
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
 
 # Load environment variables
 load_dotenv()
@@ -28,22 +34,108 @@ logging.basicConfig(
     ]
 )
 
+# Concurrency limits for the async pipeline
+MAX_CONCURRENT_FETCHES = 50
+MAX_CONNECTIONS_PER_HOST = 4
+DNS_CACHE_TTL = 900
+FETCH_TIMEOUT = aiohttp.ClientTimeout(total=10)
+GOOGLE_TIMEOUT = aiohttp.ClientTimeout(total=5)
+OPR_TIMEOUT = aiohttp.ClientTimeout(total=5)
+# Budget for one host's WHOIS, DNS and Google checks; past it the row is written with EXTERNAL_FEATURE_DEFAULTS
+EXTERNAL_TIMEOUT = 30
+
+# Shared suffix extractor backed by the bundled Public Suffix List snapshot,
+# so the first lookup never blocks on a network fetch
+_EXTRACT = tldextract.TLDExtract(suffix_list_urls=())
+
+# Known malicious IPs, loaded once for O(1) membership checks in f56
+knownip_path = os.path.join("PhishingLink", "knownip.txt")
+try:
+    with open(knownip_path, "r") as f:
+        _KNOWN_MALICIOUS_IPS = frozenset(line.strip() for line in f if line.strip())
+except Exception as e:
+    logging.error(f"Error reading known IPs from {knownip_path}: {e}")
+    _KNOWN_MALICIOUS_IPS = frozenset()
+
+# Precompiled patterns used by extract_url_features
+_IP_RE = re.compile(r"\d+\.\d+\.\d+\.\d+")
+_ABNORMAL_SUB_RE = re.compile(r"w[w\d]{1,}\d+")
+_CONSONANT_RUN_RE = re.compile(r"[bcdfghjklmnpqrstvwxyz]{4,}")
+_WORD_RE = re.compile(r"\w+")
+
+# f4–f20: special characters counted per URL
+URL_SPECIAL_CHARS = [".", "-", "@", "?", "&", "|", "=", "_", "~", "%", "/", "*", ":", ",", ";", "$", " "]
+CHAR_COUNT_BATCH_SIZE = 512
+
+# Tags inspected by extract_full_feature_set; anything not named explicitly there is media
+PAGE_FEATURE_TAGS = ["a", "link", "img", "audio", "video", "form", "iframe"]
+
+# Literal patterns for the substring features (f36, f37, f51–f55)
+SHORTENING_SERVICES = ("bit.ly", "tinyurl.com", "goo.gl", "ow.ly", "is.gd", "buff.ly", "t.co")
+SUSPICIOUS_EXTENSIONS = (".txt", ".exe", ".js")
+PHISH_HINTS = ("verify", "update", "account", "secure", "bank", "signin", "login")
+BRAND_LIST = ("paypal", "apple", "amazon", "facebook", "google", "netflix")
+SUSPICIOUS_TLDS = frozenset(["tk", "ml", "ga", "cf", "gq", "cn", "ru"])
+# Extra columns of batch_char_counts after the special-character counts
+DIGITS_COL = len(URL_SPECIAL_CHARS)
+MAX_REPEAT_COL = DIGITS_COL + 1
+
 def normalize_url(url):
     """Ensure URL has a proper protocol."""
     return url if url.startswith("http://") or url.startswith("https://") else "https://" + url
 
-def check_redirects(url):
+async def fetch_once(session, url):
+    """Fetch a page once and return (final_url, redirect_count, html) for all page-based features."""
+    async with session.get(normalize_url(url), timeout=FETCH_TIMEOUT, allow_redirects=True) as response:
+        html = await response.text(errors="replace")
+    return str(response.url), len(response.history), html
+
+@functools.lru_cache(maxsize=4096)
+def cached_gethostbyname(hostname):
+    return socket.gethostbyname(hostname)
+
+@functools.lru_cache(maxsize=4096)
+def cached_whois(hostname):
+    return whois.whois(hostname)
+
+EXTERNAL_FEATURE_DEFAULTS = {
+    "f81_whois_registered": 0,
+    "f82_registration_years": 0,
+    "f83_domain_age_days": 0,
+    "f84_web_traffic": -1,
+    "f85_dns_record": 0,
+    "f86_google_indexed": 0,
+    "f87_pagerank": -1,
+}
+
+# External features keyed by hostname: finished lookups (persisted between runs)
+# and lookups still in flight during this run. Cache entries hold the features
+# plus the raw WHOIS creation date, so f83 is recomputed whenever a record is written.
+EXTERNAL_CACHE_PATH = os.path.join("PhishingLink", "external_cache.pkl")
+_external_cache = {}
+_external_pending = {}
+
+# getaddrinfo errors that are a definitive "no such host" answer rather than a transient failure
+DNS_NEGATIVE_ERRNOS = frozenset(
+    code for code in (getattr(socket, "EAI_NONAME", None), getattr(socket, "EAI_NODATA", None)) if code is not None
+)
+
+# OpenPageRank accepts up to 100 domains per request
+OPR_URL = "https://openpagerank.com/api/v1.0/getPageRank"
+OPR_BATCH_SIZE = 100
+_pagerank_by_host = {}
+
+def check_redirects(url, ext, final_url, redirect_count):
     try:
-        url = normalize_url(url)
-        original_domain = tldextract.extract(url).registered_domain
-        response = requests.get(url, timeout=10, allow_redirects=True)
-        final_url = response.url
-        final_domain = tldextract.extract(final_url).registered_domain
-        redirected = len(response.history) > 0
+        if final_url is None:
+            raise ValueError("page could not be fetched")
+        original_domain = ext.registered_domain
+        final_domain = _EXTRACT(final_url).registered_domain
+        redirected = redirect_count > 0
         internal_redirect = redirected and (original_domain == final_domain)
         external_redirect = redirected and (original_domain != final_domain)
         return {
-            "f38_redirect_count": len(response.history),
+            "f38_redirect_count": redirect_count,
             "f39_external_redirect": int(external_redirect),
         }
     except Exception as e:
@@ -54,14 +146,36 @@ def check_redirects(url):
             "redirect_error": str(e),
         }
 
-def extract_url_features(url):
-    url = normalize_url(url)
+def batch_char_counts(urls):
+    """Per-URL special-character, digit (DIGITS_COL) and max-repeat (MAX_REPEAT_COL) counts as an int32 matrix."""
+    counts = np.zeros((len(urls), MAX_REPEAT_COL + 1), dtype=np.int32)
+    for start in range(0, len(urls), CHAR_COUNT_BATCH_SIZE):
+        batch = urls[start:start + CHAR_COUNT_BATCH_SIZE]
+        # One row of code points per URL, zero-padded to the longest URL in the batch
+        width = max(len(u) for u in batch) or 1
+        codes = np.array(batch, dtype=f"<U{width}").view(np.uint32).reshape(len(batch), width)
+        rows = counts[start:start + len(batch)]
+        for col, char in enumerate(URL_SPECIAL_CHARS):
+            rows[:, col] = (codes == ord(char)).sum(axis=1)
+        rows[:, DIGITS_COL] = ((codes >= 0x30) & (codes <= 0x39)).sum(axis=1)
+
+        # Longest run of equal code points after sorting each row; padding zeros don't count
+        ordered = np.sort(codes, axis=1)
+        positions = np.arange(width)
+        run_start = np.ones_like(ordered, dtype=bool)
+        run_start[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        last_start = np.maximum.accumulate(np.where(run_start, positions, 0), axis=1)
+        run_length = np.where(ordered != 0, positions - last_start + 1, 0)
+        rows[:, MAX_REPEAT_COL] = run_length.max(axis=1)
+    return counts
+
+def extract_url_features(url, parsed, ext, final_url, redirect_count, url_counts):
     features = {}
-    parsed = urlparse(url)
-    ext = tldextract.extract(url)
     domain = ext.domain
     full_url = url
     hostname = parsed.hostname if parsed.hostname else ""
+    # Lowercase copy shared by the keyword features below
+    lower_url = full_url.lower()
 
     # f1-2: URL and hostname length
     features["url_length"] = full_url
@@ -73,24 +187,23 @@ def extract_url_features(url):
         socket.inet_aton(hostname)
         features["f3_ip_in_url"] = 1
     except:
-        features["f3_ip_in_url"] = int(bool(re.search(r"\d+\.\d+\.\d+\.\d+", hostname)))
+        features["f3_ip_in_url"] = int(bool(_IP_RE.search(hostname)))
 
-    # f4–f20: special characters
-    special_chars = [".", "-", "@", "?", "&", "|", "=", "_", "~", "%", "/", "*", ":", ",", ";", "$", " "]
-    for i, char in enumerate(special_chars, start=4):
-        features[f"f{i}_count_{repr(char)}"] = full_url.count(char)
+    # f4–f20: special characters (precomputed by batch_char_counts)
+    for i, char in enumerate(URL_SPECIAL_CHARS, start=4):
+        features[f"f{i}_count_{repr(char)}"] = int(url_counts[i - 4])
 
     # f21–f24: common phishing terms
-    features["f21_www_count"] = full_url.lower().count("www")
-    features["f22_com_count"] = full_url.lower().count(".com")
-    features["f23_http_count"] = full_url.lower().count("http://")
+    features["f21_www_count"] = lower_url.count("www")
+    features["f22_com_count"] = lower_url.count(".com")
+    features["f23_http_count"] = lower_url.count("http://")
     features["f24_double_slash"] = full_url.count("//")
 
     # f25: HTTPS token
     features["f25_https"] = int(url.startswith("https://"))
 
     # f26–f27: ratio of digits
-    num_digits_url = sum(c.isdigit() for c in url)
+    num_digits_url = int(url_counts[DIGITS_COL])
     num_digits_host = sum(c.isdigit() for c in hostname)
     features["f26_digit_ratio_url"] = num_digits_url / len(url) if url else 0
     features["f27_digit_ratio_host"] = (num_digits_host / len(hostname)) if hostname else 0
@@ -107,7 +220,7 @@ def extract_url_features(url):
     features["f31_tld_in_subdomain"] = int(tld in ext.subdomain)
 
     # f32: abnormal subdomain
-    features["f32_abnormal_subdomain"] = int(bool(re.match(r"w[w\d]{1,}\d+", ext.subdomain)))
+    features["f32_abnormal_subdomain"] = int(bool(_ABNORMAL_SUB_RE.match(ext.subdomain)))
 
     # f33: number of subdomains
     features["f33_num_subdomains"] = (len(ext.subdomain.split(".")) if ext.subdomain else 0)
@@ -116,25 +229,24 @@ def extract_url_features(url):
     features["f34_prefix_suffix"] = int("-" in ext.domain)
 
     # f35: random-looking domain (simple consonant cluster rule)
-    features["f35_random_domain"] = int(bool(re.search(r"[bcdfghjklmnpqrstvwxyz]{4,}", ext.domain.lower())))
+    features["f35_random_domain"] = int(bool(_CONSONANT_RUN_RE.search(ext.domain.lower())))
 
     # f36: shortening service
-    shortening_services = ["bit.ly", "tinyurl.com", "goo.gl", "ow.ly", "is.gd", "buff.ly", "t.co"]
-    features["f36_shortening_service"] = int(any(service in hostname for service in shortening_services))
+    features["f36_shortening_service"] = int(any(service in hostname for service in SHORTENING_SERVICES))
 
     # f37: Suspicious file extensions
     path = parsed.path.lower()
-    features["f37_suspicious_extension"] = int(any(ext in path for ext in [".txt", ".exe", ".js"]))
+    features["f37_suspicious_extension"] = int(any(ext in path for ext in SUSPICIOUS_EXTENSIONS))
 
     # f38–f39: Redirects
-    redirect_info = check_redirects(full_url)
+    redirect_info = check_redirects(full_url, ext, final_url, redirect_count)
     features["f38_redirect_count"] = redirect_info.get("f38_redirect_count", 0)
     features["f39_external_redirect"] = redirect_info.get("f39_external_redirect", 0)
 
     # f40–f50: NLP features (stub only)
-    words = re.findall(r"\w+", full_url)
+    words = _WORD_RE.findall(full_url)
     features["f40_word_count"] = len(words)
-    features["f41_char_repeat"] = max((full_url.count(c) for c in set(full_url)), default=0)
+    features["f41_char_repeat"] = int(url_counts[MAX_REPEAT_COL])
     features["f42_shortest_word_url"] = min((len(w) for w in words), default=0)
     features["f43_shortest_word_host"] = min((len(w) for w in hostname.split(".")), default=0)
     features["f44_shortest_word_path"] = min((len(w) for w in parsed.path.split("/") if w), default=0)
@@ -147,86 +259,100 @@ def extract_url_features(url):
     features["f50_avg_word_path"] = (sum(len(w) for w in path_words) / len(path_words)) if path_words else 0
 
     # f51: Sensitive keywords (phishing hints)
-    hints = ["verify", "update", "account", "secure", "bank", "signin", "login"]
-    features["f51_phish_hints"] = sum(hint in full_url.lower() for hint in hints)
+    features["f51_phish_hints"] = sum(hint in lower_url for hint in PHISH_HINTS)
 
     # f52–f54: Brand domains
-    brand_list = ["paypal", "apple", "amazon", "facebook", "google", "netflix"]
-    features["f52_brand_in_domain"] = int(any(brand in ext.domain for brand in brand_list))
-    features["f53_brand_in_subdomain"] = int(any(brand in ext.subdomain for brand in brand_list))
-    features["f54_brand_in_path"] = int(any(brand in parsed.path for brand in brand_list))
+    features["f52_brand_in_domain"] = int(any(brand in ext.domain for brand in BRAND_LIST))
+    features["f53_brand_in_subdomain"] = int(any(brand in ext.subdomain for brand in BRAND_LIST))
+    features["f54_brand_in_path"] = int(any(brand in parsed.path for brand in BRAND_LIST))
 
     # f55: Suspicious TLDs
-    suspicious_tlds = ["tk", "ml", "ga", "cf", "gq", "cn", "ru"]
-    features["f55_suspicious_tld"] = int(tld in suspicious_tlds)
+    features["f55_suspicious_tld"] = int(tld in SUSPICIOUS_TLDS)
 
     # f56: Statistical report (placeholder)
-    try:
-        with open("PhishingLink/knownip.txt", "r") as f:
-            known_malicious_ips = [line.strip() for line in f if line.strip()]
-        features["f56_known_malicious_ip"] = int(hostname in known_malicious_ips)
-    except Exception as e:
-        logging.error(f"Error reading known IPs for {hostname}: {e}")
-        features["f56_known_malicious_ip"] = 0
+    features["f56_known_malicious_ip"] = int(hostname in _KNOWN_MALICIOUS_IPS)
 
     return features
 
-def extract_full_feature_set(url):
-    url = normalize_url(url)
+def extract_full_feature_set(url, ext, html):
     try:
-        response = requests.get(url, timeout=10)
-        html = response.text
-        soup = BeautifulSoup(html, "html.parser")
-        domain = tldextract.extract(url).domain
+        if html is None:
+            raise ValueError("page could not be fetched")
+        soup = BeautifulSoup(html, "lxml")
+        domain = ext.domain
 
-        links = soup.find_all("a", href=True)
-        total_links = len(links)
+        total_links = 0
         internal_links = 0
         external_links = 0
         null_links = 0
         safe_anchors = 0
-
-        for link in links:
-            href = link["href"]
-            if href.startswith("#") or "void" in href:
-                null_links += 1
-                safe_anchors += 1
-            elif "javascript" in href or "mailto:" in href:
-                safe_anchors += 1
-            elif domain in href:
-                internal_links += 1
+        external_css = 0
+        total_link_tags = 0
+        links_in_tags = 0
+        total_media = 0
+        internal_media = 0
+        login_forms = 0
+        empty_forms = 0
+        submit_to_email = 0
+        invisible_iframes = 0
+        external_favicon = 0
+
+        # Single walk over the tags we care about, dispatching on tag name
+        for tag in soup.find_all(PAGE_FEATURE_TAGS):
+            name = tag.name
+            href = tag.get("href")
+            if name == "a":
+                if href is None:
+                    continue
+                total_links += 1
+                if href.startswith("#") or "void" in href:
+                    null_links += 1
+                    safe_anchors += 1
+                elif "javascript" in href or "mailto:" in href:
+                    safe_anchors += 1
+                elif domain in href:
+                    internal_links += 1
+                else:
+                    external_links += 1
+            elif name == "link":
+                rel = tag.get("rel") or []
+                if "stylesheet" in rel and domain not in (href or ""):
+                    external_css += 1
+                if "icon" in " ".join(rel) and domain not in (href or ""):
+                    external_favicon += 1
+                if href is not None:
+                    total_link_tags += 1
+                    if domain in href:
+                        links_in_tags += 1
+            elif name == "form":
+                action = tag.get("action", "")
+                if any(k in action.lower() for k in ["login", "signin", "verify"]):
+                    login_forms += 1
+                if action in ["", "about:blank"]:
+                    empty_forms += 1
+                if "mailto:" in action:
+                    submit_to_email += 1
+            elif name == "iframe":
+                style = tag.get("style", "")
+                if "display:none" in style or "visibility:hidden" in style:
+                    invisible_iframes += 1
             else:
-                external_links += 1
+                total_media += 1
+                if domain in tag.get("src", ""):
+                    internal_media += 1
+        external_media = total_media - internal_media
 
         internal_redirects = html.count("location.href") + html.count("window.location")
         external_redirects = html.count("window.open")
 
-        stylesheets = soup.find_all("link", rel="stylesheet")
-        external_css = sum(1 for s in stylesheets if domain not in s.get("href", ""))
-
-        link_tags = soup.find_all("link", href=True)
-        links_in_tags = sum(1 for tag in link_tags if domain in tag["href"])
-
-        media_tags = soup.find_all(["img", "audio", "video"])
-        internal_media = sum(1 for m in media_tags if domain in m.get("src", ""))
-        external_media = len(media_tags) - internal_media
-
-        login_forms = sum(1 for f in soup.find_all("form") if any(k in f.get("action", "").lower() for k in ["login", "signin", "verify"]))
-        empty_forms = sum(1 for f in soup.find_all("form") if f.get("action", "") in ["", "about:blank"])
-        submit_to_email = sum(1 for f in soup.find_all("form") if "mailto:" in f.get("action", ""))
-
         title = soup.title.string.strip() if soup.title else ""
         has_domain_in_title = int(domain in title)
         empty_title = int(title == "")
         domain_in_copyright = int(domain in soup.get_text().lower())
 
-        invisible_iframes = sum(1 for i in soup.find_all("iframe") if "display:none" in i.get("style", "") or "visibility:hidden" in i.get("style", ""))
         disable_right_click = int("onmousedown" in html)
         onmouseover_right_click = int("event.button==2" in html)
 
-        favicons = soup.find_all("link", rel=lambda x: x and "icon" in x)
-        external_favicon = sum(1 for f in favicons if domain not in f.get("href", ""))
-
         return {
             "f57_total_links": total_links,
             "f58_ratio_internal_links": (internal_links / total_links if total_links else 0),
@@ -239,7 +365,7 @@ def extract_full_feature_set(url):
             "f65_external_errors": 0,
             "f66_login_forms": login_forms,
             "f67_external_favicon": int(external_favicon > 0),
-            "f68_links_in_tags": (links_in_tags / len(link_tags) if link_tags else 0),
+            "f68_links_in_tags": (links_in_tags / total_link_tags if total_link_tags else 0),
             "f69_submit_to_email": submit_to_email,
             "f70_internal_media": internal_media,
             "f71_external_media": external_media,
@@ -285,18 +411,115 @@ def extract_full_feature_set(url):
             "error": True
         }
 
-def extract_external_features(url, openpagerank_api_key=api_key):
-    url = normalize_url(url)
-    features = {}
+def load_external_cache(path=EXTERNAL_CACHE_PATH):
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        # Drop entries written in an older format
+        _external_cache.update(
+            (host, entry) for host, entry in cached.items()
+            if isinstance(entry, dict) and "features" in entry and "creation" in entry
+        )
+        logging.info(f"Loaded {len(_external_cache)} cached hosts from {path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.error(f"Failed to load external feature cache {path}: {e}")
+
+def save_external_cache(path=EXTERNAL_CACHE_PATH):
     try:
-        hostname = urlparse(url).hostname
-        if hostname is None:
-            return {"error": "Invalid URL"}
+        with open(path, "wb") as f:
+            pickle.dump(_external_cache, f)
+    except Exception as e:
+        logging.error(f"Failed to save external feature cache {path}: {e}")
+
+async def fetch_pagerank_batch(session, hostnames, openpagerank_api_key=api_key):
+    """Fill _pagerank_by_host for all hostnames, OPR_BATCH_SIZE domains per request."""
+    if not openpagerank_api_key:
+        return
+    for start in range(0, len(hostnames), OPR_BATCH_SIZE):
+        chunk = hostnames[start:start + OPR_BATCH_SIZE]
+        try:
+            async with session.get(
+                OPR_URL,
+                headers={"API-OPR": openpagerank_api_key},
+                params=[("domains[]", hostname) for hostname in chunk],
+                timeout=OPR_TIMEOUT,
+            ) as pr_response:
+                if pr_response.status != 200:
+                    logging.error(f"OpenPageRank returned HTTP {pr_response.status} for batch starting at {chunk[0]}")
+                    continue
+                results = (await pr_response.json(content_type=None))["response"]
+            # Key by the domain the API echoes back rather than trusting response order
+            ranks = {result["domain"]: result.get("page_rank_integer", -1) for result in results}
+        except Exception as e:
+            logging.error(f"Error fetching PageRank batch starting at {chunk[0]}: {e}")
+            continue
+        requested = set(chunk)
+        _pagerank_by_host.update((domain, rank) for domain, rank in ranks.items() if domain in requested)
+        missing = requested - ranks.keys()
+        if missing:
+            logging.error(f"OpenPageRank returned no result for {len(missing)} hosts in batch starting at {chunk[0]}")
+
+async def extract_external_features(session, hostname):
+    """External features for a hostname, looked up at most once per hostname."""
+    if hostname is None:
+        features = dict(EXTERNAL_FEATURE_DEFAULTS)
+        features["error"] = "Invalid URL"
+        return features
+
+    if hostname in _external_cache:
+        entry = _external_cache[hostname]
+        features, creation = entry["features"], entry["creation"]
+    else:
+        # Concurrent URLs on the same host share one in-flight lookup
+        task = _external_pending.get(hostname)
+        if task is None:
+            task = asyncio.ensure_future(lookup_and_cache_external_features(session, hostname))
+            _external_pending[hostname] = task
+        try:
+            # Shielded so a timeout here doesn't cancel the lookup other URLs are waiting on
+            features, creation = await asyncio.wait_for(asyncio.shield(task), timeout=EXTERNAL_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.error(f"External lookups for {hostname} timed out after {EXTERNAL_TIMEOUT}s")
+            features = dict(EXTERNAL_FEATURE_DEFAULTS)
+            features["error"] = "timeout"
+            return features
+
+    features = dict(features)
+    features["f83_domain_age_days"] = domain_age_days(creation)
+    return features
+
+async def lookup_and_cache_external_features(session, hostname):
+    features, creation, complete = await lookup_external_features(session, hostname)
+    # Only persist hosts with no transient failures, so a timeout or outage doesn't stick
+    if complete:
+        _external_cache[hostname] = {"features": features, "creation": creation}
+    return features, creation
 
+def domain_age_days(creation):
+    try:
+        return (datetime.datetime.now() - creation).days
+    except:
+        return 0
+
+async def lookup_external_features(session, hostname):
+    """Return (features, creation_date, complete); complete is False after any transient failure."""
+    # Start from defaults so every record has the same columns, even on failure.
+    features = dict(EXTERNAL_FEATURE_DEFAULTS)
+    creation = None
+    complete = True
+    try:
         try:
-            w = whois.whois(hostname)
+            # Blocking lookups run on the default thread pool so the event loop keeps serving other URLs
+            w = await asyncio.to_thread(cached_whois, hostname)
             features["f81_whois_registered"] = int(w.domain_name is not None)
+        except OSError:
+            # Network trouble (timeouts, refused connections): retry on a later run
+            features["f81_whois_registered"] = 0
+            complete = False
         except:
+            # python-whois raises for unregistered domains and IP hosts; that is a final answer
             features["f81_whois_registered"] = 0
 
         try:
@@ -311,112 +534,168 @@ def extract_external_features(url, openpagerank_api_key=api_key):
         except:
             features["f82_registration_years"] = 0
 
+        # f83 is derived from the creation date by extract_external_features
         try:
             creation = w.creation_date
             if isinstance(creation, list):
                 creation = creation[0]
-            domain_age = (datetime.datetime.now() - creation).days
-            features["f83_domain_age_days"] = domain_age
         except:
-            features["f83_domain_age_days"] = 0
+            creation = None
 
         features["f84_web_traffic"] = -1
 
         try:
-            socket.gethostbyname(hostname)
+            await asyncio.to_thread(cached_gethostbyname, hostname)
             features["f85_dns_record"] = 1
+        except socket.gaierror as e:
+            features["f85_dns_record"] = 0
+            if e.errno not in DNS_NEGATIVE_ERRNOS:
+                complete = False
         except socket.error:
             features["f85_dns_record"] = 0
+            complete = False
 
         google_query = f"https://www.google.com/search?q=site:{hostname}"
         headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(google_query, headers=headers, timeout=5)
-        features["f86_google_indexed"] = int("did not match any documents" not in response.text.lower())
+        async with session.get(google_query, headers=headers, timeout=GOOGLE_TIMEOUT) as response:
+            google_status = response.status
+            google_html = await response.text(errors="replace")
+        if google_status == 200:
+            features["f86_google_indexed"] = int("did not match any documents" not in google_html.lower())
+        else:
+            # Rate limiting or captcha pages say nothing about the index
+            logging.error(f"Google returned HTTP {google_status} for {hostname}")
+            complete = False
 
-        if openpagerank_api_key:
-            pr_response = requests.get(
-                "https://openpagerank.com/api/v1.0/getPageRank",
-                headers={"API-OPR": openpagerank_api_key},
-                params={"domains[]": hostname},
-            )
-            if pr_response.status_code == 200:
-                rank = pr_response.json()["response"][0].get("page_rank_integer", -1)
-                features["f87_pagerank"] = rank
-            else:
-                features["f87_pagerank"] = -1
+        # Filled up front by fetch_pagerank_batch; without an API key -1 is the final value
+        if hostname in _pagerank_by_host:
+            features["f87_pagerank"] = _pagerank_by_host[hostname]
         else:
             features["f87_pagerank"] = -1
+            if api_key:
+                complete = False
 
     except Exception as e:
-        logging.error(f"Error processing external features for {url}: {e}")
+        logging.error(f"Error processing external features for {hostname}: {e}")
         features["error"] = str(e)
+        complete = False
 
-    return features
+    return features, creation, complete
 
-totalfeat = []
+def featurize_page(url, parsed, ext, final_url, redirect_count, html, url_counts):
+    """URL and page features for one fetched URL; module-level so it can run in the process pool."""
+    urlfeat = extract_url_features(url, parsed, ext, final_url, redirect_count, url_counts)
+    Htmlfeat = extract_full_feature_set(url, ext, html)
+    return {**urlfeat, **Htmlfeat}
 
-# Process Whitelist URLs
-whitelist_path = os.path.join("PhishingLink", "Whitelist.txt")
-try:
-    with open(whitelist_path, "r") as white:
-        white_list = white.readlines()
-except Exception as e:
-    logging.error(f"Failed to open {whitelist_path}: {e}")
-    white_list = []
-
-random.shuffle(white_list) 
-
-for idx, i in enumerate(white_list[:2000]):
-    url = i.strip()
+async def process_url(session, executor, url, is_phishing, url_counts):
+    # Parse once and hand the pieces to every extractor
+    url = normalize_url(url)
+    parsed = urlsplit(url)
+    ext = _EXTRACT(url)
     try:
-        urlfeat = extract_url_features(url)
-        Htmlfeat = extract_full_feature_set(url)
-        Exfeat = extract_external_features(url)
-        result = {"isPhishing": False}
-        combined = {**urlfeat, **Htmlfeat, **Exfeat, **result}
-        totalfeat.append(combined)
-        if idx % 5 == 0:
-            logging.info(f"[+] Processed whitelist URL {idx}")
+        final_url, redirect_count, html = await fetch_once(session, url)
     except Exception as e:
-        logging.error(f"Error processing whitelist URL {url}: {e}")
-logging.info("Finished processing whitelist.")
+        logging.error(f"Error fetching {url}: {e}")
+        final_url, redirect_count, html = None, 0, None
+    # Parsing is CPU-bound, so it runs on another core while the loop keeps fetching
+    loop = asyncio.get_running_loop()
+    pagefeat = await loop.run_in_executor(
+        executor, featurize_page, url, parsed, ext, final_url, redirect_count, html, url_counts
+    )
+    Exfeat = await extract_external_features(session, parsed.hostname)
+    result = {"isPhishing": is_phishing}
+    return {**pagefeat, **Exfeat, **result}
+
+async def process_url_list(session, executor, sem, urls, is_phishing, label, write_record):
+    """Extract and write features for every URL in the list, returning the number of rows written."""
+    counts = batch_char_counts([normalize_url(url) for url in urls])
+
+    async def sem_bound(idx, url):
+        async with sem:
+            try:
+                combined = await process_url(session, executor, url, is_phishing, counts[idx])
+                write_record(combined)
+            except Exception as e:
+                logging.error(f"Error processing {label} URL {url}: {e}")
+                return False
+        if idx % 5 == 0:
+            logging.info(f"[+] Processed {label} URL {idx}")
+        return True
 
-blacklist_path = os.path.join("PhishingLink", "Blacklist.txt")
-try:
-    with open(blacklist_path, "r") as black:
-        black_list = black.readlines()
-except Exception as e:
-    logging.error(f"Failed to open {blacklist_path}: {e}")
-    black_list = []
+    results = await asyncio.gather(*[sem_bound(idx, url) for idx, url in enumerate(urls)])
+    return sum(results)
 
-for idx, i in enumerate(black_list[:2000]):
-    url = i.strip()
+def read_url_list(path):
     try:
-        urlfeat = extract_url_features(url)
-        Htmlfeat = extract_full_feature_set(url)
-        Exfeat = extract_external_features(url)
-        result = {"isPhishing": True}
-        combined = {**urlfeat, **Htmlfeat, **Exfeat, **result}
-        totalfeat.append(combined)
-        if idx % 5 == 0:
-            logging.info(f"[+] Processed blacklist URL {idx}")
+        with open(path, "r") as f:
+            return f.readlines()
     except Exception as e:
-        logging.error(f"Error processing blacklist URL {url}: {e}")
-logging.info("Finished processing blacklist.")
-
-
-# Write results to CSV
-csv_path = os.path.join("PhishingLink", "FeaturesColumn.csv")
-if totalfeat:
+        logging.error(f"Failed to open {path}: {e}")
+        return []
+
+async def main():
+    load_external_cache()
+    # WHOIS and DNS run via asyncio.to_thread; give every in-flight URL its own thread
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES))
+    # Save in finally so lookups made before a crash are kept for the next run
     try:
-        # Use all keys from the first record; you may want to use a union of keys if records differ.
-        fieldnames = list(totalfeat[0].keys())
+        sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_FETCHES, limit_per_host=MAX_CONNECTIONS_PER_HOST, use_dns_cache=True, ttl_dns_cache=DNS_CACHE_TTL)
+
+        # Stream results to CSV as they arrive so a failure mid-run keeps what was already extracted
+        csv_path = os.path.join("PhishingLink", "FeaturesColumn.csv")
         with open(csv_path, mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(totalfeat)
-        logging.info(f"CSV successfully written to {csv_path}")
-    except Exception as e:
-        logging.error(f"Error writing CSV: {e}")
-else:
-    logging.error("No features were extracted; CSV not written.")
+            writer = None
+
+            def write_record(record):
+                nonlocal writer
+                if writer is None:
+                    # Every record carries the same keys, so the first one fixes the header.
+                    writer = csv.DictWriter(f, fieldnames=list(record.keys()))
+                    writer.writeheader()
+                writer.writerow(record)
+
+            whitelist_path = os.path.join("PhishingLink", "Whitelist.txt")
+            white_list = read_url_list(whitelist_path)
+            random.shuffle(white_list)
+            white_urls = [i.strip() for i in white_list[:2000]]
+
+            blacklist_path = os.path.join("PhishingLink", "Blacklist.txt")
+            black_list = read_url_list(blacklist_path)
+            black_urls = [i.strip() for i in black_list[:2000]]
+
+            # Never fork: by the time workers start, the event loop and aiohttp resolver threads
+            # exist, and forking a multi-threaded process can deadlock
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            mp_context = multiprocessing.get_context(start_method)
+            with ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=mp_context) as executor:
+                async with aiohttp.ClientSession(connector=connector) as session:
+                    # Rank every uncached host in a few batched OpenPageRank calls
+                    hostnames = set()
+                    for url in white_urls + black_urls:
+                        try:
+                            hostname = urlsplit(normalize_url(url)).hostname
+                        except ValueError:
+                            continue
+                        if hostname and hostname not in _external_cache:
+                            hostnames.add(hostname)
+                    await fetch_pagerank_batch(session, sorted(hostnames))
+
+                    # Process Whitelist URLs
+                    written = await process_url_list(session, executor, sem, white_urls, False, "whitelist", write_record)
+                    logging.info("Finished processing whitelist.")
+
+                    # Process Blacklist URLs
+                    written += await process_url_list(session, executor, sem, black_urls, True, "blacklist", write_record)
+                    logging.info("Finished processing blacklist.")
+    finally:
+        save_external_cache()
+
+    if written:
+        logging.info(f"CSV successfully written to {csv_path} ({written} rows)")
+    else:
+        logging.error("No features were extracted; CSV is empty.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
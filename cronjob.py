@@ -77,7 +77,7 @@ try:
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36"
     }
     id_url = "https://tranco-list.eu/top-1m-id?subdomains=true"
-    response = requests.get(id_url, headers=headers)
+    response = requests.get(id_url, headers=headers, timeout=10)
     response.raise_for_status()
     list_id = response.text.strip()
 
@@ -85,7 +85,7 @@ try:
     zip_url = f"https://tranco-list.eu/download_daily/{list_id}"
 
     # Zip Extraction
-    zip_resp = requests.get(zip_url, headers=headers)
+    zip_resp = requests.get(zip_url, headers=headers, timeout=10)
     zip_resp.raise_for_status()
 
     with zipfile.ZipFile(io.BytesIO(zip_resp.content)) as z:
@@ -123,7 +123,7 @@ except Exception as e:
 
 try:
     url = "https://www.spamhaus.org/drop/drop.txt"
-    response = requests.get(url)
+    response = requests.get(url, timeout=10)
     lines = response.text.strip().splitlines()
 
     # Extract new CIDRs from the response
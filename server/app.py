@@ -338,6 +338,7 @@ def extract_external_features(url, openpagerank_api_key=api_key):
                 "https://openpagerank.com/api/v1.0/getPageRank",
                 headers={"API-OPR": openpagerank_api_key},
                 params={"domains[]": hostname},
+                timeout=5,
             )
             if pr_response.status_code == 200:
                 rank = pr_response.json()["response"][0].get("page_rank_integer", -1)
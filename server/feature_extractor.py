@@ -2,10 +2,32 @@
 
 import re
 import socket
+import functools
+import threading
 import urllib.parse
+from collections import Counter
+from math import log2
 import requests
 import tldextract
-from bs4 import BeautifulSoup
+from cachetools import TTLCache, cached
+from lxml import etree
+from lxml import html as lh
+
+# Shared suffix extractor backed by the bundled Public Suffix List snapshot
+_EXTRACT = tldextract.TLDExtract(suffix_list_urls=())
+
+# Precompiled XPath expressions for the content features
+_XP_NUM_LINKS = etree.XPath("count(//a)")
+_XP_NUM_IMAGES = etree.XPath("count(//img)")
+_XP_NUM_SCRIPTS = etree.XPath("count(//script)")
+_XP_NUM_IFRAMES = etree.XPath("count(//iframe)")
+_XP_NUM_FORMS = etree.XPath("count(//form)")
+_XP_NUM_META = etree.XPath("count(//meta)")
+_XP_HAS_PASSWORD = etree.XPath("boolean(//input[@type='password'])")
+_XP_EXT_SCRIPTS = etree.XPath("boolean(//script[@src and not(starts-with(@src, $u))])")
+
+# Padding to simulate 86 features: f01–f44 are computed, the rest are zero
+_PLACEHOLDERS = {f"f{i:02d}_placeholder": 0 for i in range(45, 87)}
 
 # -------------------------
 # Helper functions
@@ -19,23 +41,44 @@ def is_ip_address(domain):
         return False
 
 def get_domain(url):
-    extracted = tldextract.extract(url)
+    extracted = _EXTRACT(url)
     domain = f"{extracted.domain}.{extracted.suffix}"
     return domain
 
+# Pages are cached briefly; failed requests and non-200 responses raise and are not cached
+@cached(TTLCache(maxsize=1024, ttl=600), lock=threading.Lock())
+def _fetch_html(url):
+    response = requests.get(url, timeout=5)
+    if response.status_code != 200:
+        raise requests.HTTPError(f"unexpected status {response.status_code}", response=response)
+    return response.text
+
 def get_html_content(url):
     try:
-        response = requests.get(url, timeout=5)
-        return response.text if response.status_code == 200 else ""
+        return _fetch_html(url)
     except:
         return ""
 
+def parse_html(html):
+    try:
+        return lh.fromstring(html.encode("utf-8"))
+    except (etree.ParserError, ValueError):
+        # Empty or unparseable page: fall back to an empty document
+        return lh.fromstring("<html></html>")
+
+@functools.lru_cache(maxsize=4096)
+def _google_indexed(domain):
+    query = f"https://www.google.com/search?q=site:{domain}"
+    headers = {"User-Agent": "Mozilla/5.0"}
+    response = requests.get(query, headers=headers, timeout=5)
+    # A 429 or captcha page says nothing about the index; raise so it isn't cached as "indexed"
+    if response.status_code != 200:
+        raise requests.HTTPError(f"unexpected status {response.status_code}", response=response)
+    return int("did not match any documents" not in response.text)
+
 def google_index_check(domain):
     try:
-        query = f"https://www.google.com/search?q=site:{domain}"
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(query, headers=headers, timeout=5)
-        return int("did not match any documents" not in response.text)
+        return _google_indexed(domain)
     except:
         return 0
 
@@ -43,9 +86,8 @@ def google_index_check(domain):
 # Feature Extractors
 # -------------------------
 
-def extract_lexical_features(url):
+def extract_lexical_features(url, parsed, registered_domain):
     features = {}
-    parsed = urllib.parse.urlparse(url)
     domain = parsed.netloc
     path = parsed.path
 
@@ -65,17 +107,17 @@ def extract_lexical_features(url):
     features["f14_path_length"] = len(path)
     features["f15_num_subdomains"] = domain.count('.') - 1
     features["f16_is_https"] = int(parsed.scheme == "https")
-    features["f17_domain_in_path"] = int(get_domain(url) in path)
+    features["f17_domain_in_path"] = int(registered_domain in path)
     features["f18_num_digits"] = sum(c.isdigit() for c in url)
     features["f19_num_letters"] = sum(c.isalpha() for c in url)
-    features["f20_url_entropy"] = round(sum(-url.count(c) / len(url) * (url.count(c) / len(url)).bit_length()
-                                        for c in set(url) if c), 4) if url else 0
+    # Shannon entropy over the URL's character distribution
+    n = len(url)
+    features["f20_url_entropy"] = round(-sum((c / n) * log2(c / n) for c in Counter(url).values()), 4) if n else 0
 
     return features
 
-def extract_domain_features(url):
+def extract_domain_features(domain):
     features = {}
-    domain = get_domain(url)
 
     features["f21_tld_length"] = len(domain.split('.')[-1])
     features["f22_domain_is_ip"] = int(is_ip_address(domain))
@@ -93,25 +135,23 @@ def extract_domain_features(url):
 def extract_content_features(url):
     features = {}
     html = get_html_content(url)
-    soup = BeautifulSoup(html, "html.parser")
-
-    features["f31_num_links"] = len(soup.find_all('a'))
-    features["f32_num_images"] = len(soup.find_all('img'))
-    features["f33_num_scripts"] = len(soup.find_all('script'))
-    features["f34_num_iframes"] = len(soup.find_all('iframe'))
-    features["f35_num_forms"] = len(soup.find_all('form'))
-    features["f36_has_login_form"] = int(bool(soup.find('input', {'type': 'password'})))
-    features["f37_external_scripts"] = int(any('src' in tag.attrs and not tag.attrs['src'].startswith(url)
-                                              for tag in soup.find_all('script') if 'src' in tag.attrs))
-    features["f38_num_meta_tags"] = len(soup.find_all('meta'))
+    tree = parse_html(html)
+
+    features["f31_num_links"] = int(_XP_NUM_LINKS(tree))
+    features["f32_num_images"] = int(_XP_NUM_IMAGES(tree))
+    features["f33_num_scripts"] = int(_XP_NUM_SCRIPTS(tree))
+    features["f34_num_iframes"] = int(_XP_NUM_IFRAMES(tree))
+    features["f35_num_forms"] = int(_XP_NUM_FORMS(tree))
+    features["f36_has_login_form"] = int(_XP_HAS_PASSWORD(tree))
+    features["f37_external_scripts"] = int(_XP_EXT_SCRIPTS(tree, u=url))
+    features["f38_num_meta_tags"] = int(_XP_NUM_META(tree))
     features["f39_contains_mailto"] = int('mailto:' in html)
     features["f40_contains_tel"] = int('tel:' in html)
 
     return features
 
-def extract_external_features(url):
+def extract_external_features(url, domain):
     features = {}
-    domain = get_domain(url)
 
     # Placeholder example — use verified APIs or pre-downloaded data sources
     features["f41_in_top_1m"] = 0  # Example placeholder
@@ -126,14 +166,15 @@ def extract_external_features(url):
 # -------------------------
 
 def extract_features(url):
+    # Parse once and share the result with every extractor
+    parsed = urllib.parse.urlsplit(url)
+    domain = get_domain(url)
+
     features = {}
-    features.update(extract_lexical_features(url))
-    features.update(extract_domain_features(url))
+    features.update(extract_lexical_features(url, parsed, domain))
+    features.update(extract_domain_features(domain))
     features.update(extract_content_features(url))
-    features.update(extract_external_features(url))
-
-    # Padding to simulate 86 features
-    for i in range(len(features) + 1, 87):
-        features[f"f{i:02d}_placeholder"] = 0
+    features.update(extract_external_features(url, domain))
+    features.update(_PLACEHOLDERS)
 
     return features
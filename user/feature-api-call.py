@@ -2,17 +2,19 @@ import requests
 import time
 
 # 1. Send a POST request to start the task
-response = requests.post("http://localhost:8000/start-task/", json={"data": "some input"})
+response = requests.post("http://localhost:8000/start-task/", json={"data": "some input"}, timeout=5)
 task_info = response.json()
 task_id = task_info["task_id"]
 
 print(f"Task started with ID: {task_id}")
 
-# 2. Poll the status endpoint until the task finishes
+# 2. Poll the status endpoint until the task finishes, backing off so short tasks return quickly
 status_url = f"http://localhost:8000/task-status/{task_id}"
+poll_interval = 0.1
+max_poll_interval = 2.0
 
 while True:
-    status_response = requests.get(status_url)
+    status_response = requests.get(status_url, timeout=5)
     status_data = status_response.json()
     
     status = status_data.get("status")
@@ -26,4 +28,5 @@ while True:
         break
     else:
         # still running
-        time.sleep(2)  # wait before polling again
+        time.sleep(poll_interval)  # wait before polling again
+        poll_interval = min(poll_interval * 1.7, max_poll_interval)